@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+backends.py
+~~~~~~~~~~~
+Pluggable DataFrame engines for the load → clean → aggregate stages.
+
+The heavy, column-wise stages of the pipeline can run on:
+• pandas  – default, single-threaded, in memory
+• polars  – lazy frames, multi-threaded, streaming (needs `polars`, `pyarrow`)
+• duckdb  – SQL engine, multi-threaded, out-of-core (needs `duckdb`)
+
+The engine is chosen with the `CLONALYZER_BACKEND` environment variable
+(or the `backend=` argument).  Every function returns a pandas DataFrame,
+so the rest of each script is unchanged.
+
+Stages
+------
+read_samples()  `pd.read_csv(...).assign(...).query(...).sort_values(...)`
+                chains of `interval_kinetics.py` / `exp_phase_kinetics.py`
+mean_sd()       `groupby(...).agg(["mean", "std"])` of `grouped_kinetics.py`
+
+Notes
+-----
+All engines read the tokens in `NA_VALUES` (pandas' defaults: "NA",
+"N/A", "nan", "null", …) as missing.  Column types are inferred by each
+engine, so coerce every column the caller computes with via `numeric=`.  A column with no values at all
+is numeric (all-NaN) for pandas but text for Polars/DuckDB, so only pandas
+reports `<col>_mean` / `<col>_std` for it (all NaN either way).
+
+Run this file directly to check Polars/DuckDB against pandas and to
+benchmark the three engines on a synthetic dataset.
+
+Author
+------
+Emiliano Balderas R. | 16 Jul 2025
+"""
+
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# ───── Configuration ───────────────────────────────────────────────────── #
+BACKEND  = os.environ.get("CLONALYZER_BACKEND", "pandas").lower()
+BACKENDS = ("pandas", "polars", "duckdb")
+
+SORT_KEYS   = ["Clone", "Rep", "t_hr"]
+TRUE_VALUES = ["true", "t", "1"]
+
+# Cells read as missing by every engine (pandas' default `na_values`)
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
+
+# Types DuckDB may infer from CSV text; dates/times stay as text like pandas
+DUCKDB_TYPES = "['BOOLEAN', 'BIGINT', 'DOUBLE', 'VARCHAR']"
+
+BENCH_ROWS = 2_000_000
+
+def _resolve(backend):
+    backend = (backend or BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; choose one of {BACKENDS}")
+    return backend
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _sql_path(path):
+    return "'" + str(path).replace("'", "''") + "'"
+
+def _duckdb_csv(path, **options):
+    """DuckDB `read_csv(...)` call with pandas-like type and NA handling."""
+    opts = "".join(f", {k}={v}" for k, v in options.items())
+    return (f"read_csv({_sql_path(path)}, header=true{opts}, "
+            f"nullstr={NA_VALUES!r}, auto_type_candidates={DUCKDB_TYPES})")
+
+def _missing_as_nan(df):
+    """Polars/DuckDB return None for missing text; pandas uses NaN."""
+    obj = df.select_dtypes(include="object").columns
+    df[obj] = df[obj].where(df[obj].notna(), np.nan)
+    return df
+
+# ───── Stage 1: load and clean samples ────────────────────────────────── #
+def read_samples(path, numeric=(), flags=(), required=(), window=None, backend=None):
+    """Load a Clonalyzer CSV (skips metadata row) and clean it.
+
+    • drop rows missing any `required` column (empty or an `NA_VALUES` token)
+    • coerce `numeric` columns (invalid → NaN)
+    • parse `flags` as booleans ("true", "t", "1"; missing → False)
+    • keep `window[0] <= t_hr <= window[1]` if a window is given
+    • sort by Clone × Rep × t_hr
+    """
+    backend = _resolve(backend)
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"❌ Input file not found:\n  {path}")
+
+    if backend == "pandas":
+        df = pd.read_csv(path, skiprows=1)
+        if required:
+            df = df.dropna(subset=list(required))
+        df = df.assign(
+            **{c: (lambda d, c=c: pd.to_numeric(d[c], errors="coerce")) for c in numeric},
+            **{f: (lambda d, f=f: d[f].fillna(False)
+                   .apply(lambda x: str(x).strip().lower() in TRUE_VALUES)) for f in flags},
+        )
+        if window is not None:
+            df = df[df["t_hr"].between(*window)]
+        return df.sort_values(SORT_KEYS, ignore_index=True)
+
+    if backend == "polars":
+        import polars as pl
+
+        lf = pl.scan_csv(path, skip_rows=1, infer_schema_length=None,
+                         null_values=NA_VALUES)
+        if required:
+            lf = lf.drop_nulls(subset=list(required))
+        lf = lf.with_columns(
+            *[pl.col(c).cast(pl.Float64, strict=False) for c in numeric],
+            *[pl.col(f).cast(pl.Utf8).str.strip_chars().str.to_lowercase()
+                .is_in(TRUE_VALUES).fill_null(False) for f in flags],
+        )
+        if window is not None:
+            lf = lf.filter(pl.col("t_hr").is_between(*window))
+        lf = lf.sort(SORT_KEYS, nulls_last=True, maintain_order=True)
+        return _missing_as_nan(lf.collect(engine="streaming").to_pandas())
+
+    import duckdb
+
+    replace = [f"TRY_CAST({_quote(c)} AS DOUBLE) AS {_quote(c)}" for c in numeric]
+    replace += [
+        f"coalesce(lower(trim(CAST({_quote(f)} AS VARCHAR))) IN "
+        f"({', '.join(repr(v) for v in TRUE_VALUES)}), false) AS {_quote(f)}"
+        for f in flags
+    ]
+    select = f"* REPLACE ({', '.join(replace)})" if replace else "*"
+    where = [f"{_quote(c)} IS NOT NULL" for c in required]
+    if window is not None:
+        where.append(f"t_hr BETWEEN {float(window[0])} AND {float(window[1])}")
+
+    sql = (
+        f"SELECT {select} FROM {_duckdb_csv(path, skip=1)} "
+        + (f"WHERE {' AND '.join(where)} " if where else "")
+        + f"ORDER BY {', '.join(_quote(k) + ' NULLS LAST' for k in SORT_KEYS)}"
+    )
+    with duckdb.connect() as con:
+        return _missing_as_nan(con.sql(sql).df())
+
+# ───── Stage 2: grouped mean ± SD ─────────────────────────────────────── #
+def mean_sd(source, keys, exclude=(), names=("mean", "std"), backend=None):
+    """Mean and sample SD of every numeric column per `keys` group.
+
+    `source` is a DataFrame or a CSV path (read lazily by Polars/DuckDB).
+    Columns in `keys` and `exclude` are not aggregated; the rest are
+    processed in sorted order and named `<col>_<names[0]>`,
+    `<col>_<names[1]>`.  Rows with a missing key are dropped and the result
+    is sorted by `keys`.
+    """
+    backend = _resolve(backend)
+    keys, skip = list(keys), set(keys) | set(exclude)
+    is_frame = isinstance(source, pd.DataFrame)
+
+    if backend == "pandas":
+        df = source if is_frame else pd.read_csv(source)
+        cols = df.select_dtypes(include="number").columns.difference(list(skip))
+        out = (
+            df.groupby(keys, observed=True)[cols]
+              .agg(["mean", "std"])
+              .rename(columns={"mean": names[0], "std": names[1]})
+        )
+        out.columns = [f"{var}_{stat}" for var, stat in out.columns]
+        return out.reset_index()
+
+    if backend == "polars":
+        import polars as pl
+
+        lf = (pl.from_pandas(source).lazy() if is_frame else
+              pl.scan_csv(source, infer_schema_length=None, null_values=NA_VALUES))
+        schema = lf.collect_schema()
+        cols = sorted(c for c, dt in schema.items() if dt.is_numeric() and c not in skip)
+        aggs = []
+        for c in cols:
+            aggs += [pl.col(c).mean().alias(f"{c}_{names[0]}"),
+                     pl.col(c).std().alias(f"{c}_{names[1]}")]
+        return (
+            lf.drop_nulls(subset=keys)
+              .group_by(keys)
+              .agg(aggs)
+              .sort(keys)
+              .collect(engine="streaming")
+              .to_pandas()
+        )
+
+    import duckdb
+
+    with duckdb.connect() as con:
+        if is_frame:
+            con.register("src", source)
+            rel = "src"
+        else:
+            rel = _duckdb_csv(source)
+
+        schema = con.sql(f"DESCRIBE SELECT * FROM {rel}").df()
+        numeric_types = ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+                         "FLOAT", "DOUBLE", "DECIMAL", "UTINYINT", "USMALLINT",
+                         "UINTEGER", "UBIGINT")
+        cols = sorted(
+            c for c, t in zip(schema["column_name"], schema["column_type"])
+            if t.split("(")[0] in numeric_types and c not in skip
+        )
+        aggs = []
+        for c in cols:
+            aggs += [f"avg({_quote(c)}) AS {_quote(f'{c}_{names[0]}')}",
+                     f"stddev_samp({_quote(c)}) AS {_quote(f'{c}_{names[1]}')}"]
+        key_sql = ", ".join(_quote(k) for k in keys)
+        sql = (
+            f"SELECT {key_sql}, {', '.join(aggs)} FROM {rel} "
+            f"WHERE {' AND '.join(_quote(k) + ' IS NOT NULL' for k in keys)} "
+            f"GROUP BY {key_sql} ORDER BY {key_sql}"
+        )
+        return con.sql(sql).df()
+
+# ───── Parity check & benchmark ───────────────────────────────────────── #
+def _available():
+    found = ["pandas"]
+    for name, modules in (("polars", ("polars", "pyarrow")), ("duckdb", ("duckdb",))):
+        try:
+            for m in modules:
+                __import__(m)
+            found.append(name)
+        except ImportError:
+            pass
+    return found
+
+def _synthetic_csv(path, n_rows, seed=0, na_frac=0.0, metadata=True):
+    """Random samples; `na_frac` of the Clone/t_hr/VCD/Glc cells get NA tokens."""
+    rng = np.random.default_rng(seed)
+    n_series = max(n_rows // 20, 1)
+    df = pd.DataFrame({
+        "t_hr":     np.tile(np.arange(20) * 12.0, n_series)[:n_rows],
+        "Clone":    np.repeat([f"C{i:05d}" for i in range(n_series // 3 + 1)], 60)[:n_rows],
+        "Rep":      np.tile(np.repeat([1, 2, 3], 20), n_series // 3 + 1)[:n_rows],
+        "is_post_feed": rng.choice(["TRUE", "FALSE", ""], n_rows),
+        "VCD":      rng.uniform(1e5, 1e7, n_rows),
+        "Vol_mL":   rng.uniform(25, 35, n_rows),
+        "Glc_g_L":  rng.uniform(0, 8, n_rows),
+        "Lac_g_L":  rng.uniform(0, 3, n_rows),
+    })
+    if na_frac:
+        tokens = ["NA", "N/A", "nan", "null", "NULL", "None", "#N/A", ""]
+        for col in ["Clone", "t_hr", "VCD", "Glc_g_L"]:
+            hit = rng.random(n_rows) < na_frac
+            df[col] = df[col].astype(object)
+            df.loc[hit, col] = rng.choice(tokens, hit.sum())
+    df = df.sample(frac=1, random_state=seed)
+    with open(path, "w") as fh:
+        if metadata:
+            fh.write("synthetic benchmark data\n")
+        df.to_csv(fh, index=False)
+
+def _compare(ref, other, label):
+    pd.testing.assert_frame_equal(
+        ref.reset_index(drop=True), other[ref.columns].reset_index(drop=True),
+        check_dtype=False, rtol=1e-9,
+    )
+    print(f"✓ {label} matches pandas")
+
+if __name__ == "__main__":
+    engines = _available()
+    numeric = ["t_hr", "Rep", "VCD", "Vol_mL", "Glc_g_L", "Lac_g_L"]
+    keys = ["Clone", "t_hr"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Parity on a small dataset with NA tokens, in memory and from CSV
+        small, small_flat = Path(tmp) / "small.csv", Path(tmp) / "small_flat.csv"
+        _synthetic_csv(small, 20_000, na_frac=0.02)
+        _synthetic_csv(small_flat, 20_000, seed=1, na_frac=0.02, metadata=False)
+
+        ref_rows = read_samples(small, numeric, ["is_post_feed"], ["Clone", "VCD"],
+                                (0, 96), "pandas")
+        ref_agg = mean_sd(ref_rows, keys, names=("avg", "sd"), backend="pandas")
+        ref_csv = mean_sd(small_flat, keys, names=("avg", "sd"), backend="pandas")
+        print()
+        for eng in engines[1:]:
+            rows = read_samples(small, numeric, ["is_post_feed"], ["Clone", "VCD"],
+                                (0, 96), eng)
+            _compare(ref_rows, rows, f"{eng} read_samples (CSV)")
+            _compare(ref_agg, mean_sd(ref_rows, keys, names=("avg", "sd"), backend=eng),
+                     f"{eng} mean_sd (DataFrame)")
+            _compare(ref_csv, mean_sd(small_flat, keys, names=("avg", "sd"), backend=eng),
+                     f"{eng} mean_sd (CSV)")
+
+        # Throughput on a large dataset, read straight from disk by each engine
+        big, big_flat = Path(tmp) / "big.csv", Path(tmp) / "big_flat.csv"
+        _synthetic_csv(big, BENCH_ROWS)
+        _synthetic_csv(big_flat, BENCH_ROWS, metadata=False)
+        print(f"\n=== Benchmark: {BENCH_ROWS:,} rows, {os.cpu_count()} CPU ===")
+        for eng in BACKENDS:
+            if eng not in engines:
+                print(f"{eng:<7}: not installed")
+                continue
+            t0 = time.perf_counter()
+            read_samples(big, numeric, ["is_post_feed"], backend=eng)
+            t1 = time.perf_counter()
+            mean_sd(big_flat, keys, backend=eng)
+            t2 = time.perf_counter()
+            print(f"{eng:<7}: load+clean {t1 - t0:6.2f} s | mean ± SD (CSV) {t2 - t1:6.2f} s "
+                  f"| {2 * BENCH_ROWS / (t2 - t0) / 1e6:5.2f} M rows/s")
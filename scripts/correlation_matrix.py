@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+correlation_matrix.py
+~~~~~~~~~~~~~~~~~~~~~
+Full correlation matrices over every kinetic parameter and measured
+variable, pooled and per clone.
+
+`plot_raw.py` / `plot_grouped.py` draw a handful of hand-picked pairs
+(`PAIR_CORR` / `PLOT_CORR`).  This script screens *all* pairs at once:
+
+• Pearson and Spearman r for every pair of numeric variables
+• Pairwise-complete NaN handling (each pair uses the rows where both
+  variables are present)
+• Two-sided p-values (t-distribution with n − 2 df) and n per pair
+
+Sums, cross-products and counts come from matrix products of the data and
+its missing-value mask, so each matrix is one vectorized pass.  For
+Spearman, columns are grouped by missingness pattern and ranked on the
+rows shared by each pair of patterns, which keeps the ranks exact.
+
+Workflow
+--------
+1. Load `outputs/interval_kinetics.csv` (or the sensor-joined table).
+2. Select all numeric columns except `EXCLUDE`.
+3. Compute Pearson and Spearman matrices, pooled and for each Clone.
+4. Save one long-format CSV and a clustered heatmap of the pooled matrix.
+
+Outputs
+-------
+• outputs/correlation_matrix.csv           – scope (pooled | Clone), method,
+                                             var_x, var_y, r, p, n
+• outputs/figures_corr/corr_clustermap.png – pooled `HEATMAP_METHOD` r
+
+Author
+------
+Emiliano Balderas R. | 16 Jul 2025
+"""
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+from pathlib import Path
+from scipy import stats
+
+# ───── Configuration ───────────────────────────────────────────────────── #
+CSV_PATH   = Path("outputs/interval_kinetics.csv")
+OUTFILE    = Path("outputs/correlation_matrix.csv")
+FIGURE_DIR = Path("outputs/figures_corr")
+
+METHODS        = ["pearson", "spearman"]
+HEATMAP_METHOD = "pearson"
+EXCLUDE        = ["Rep", "t_day", "t_hr", "t_start"]  # identifiers and time axes
+MIN_PAIRS      = 3                                     # n below this → r = NaN
+
+DPI = 300
+
+# ───── Vectorized pairwise-complete correlation ───────────────────────── #
+def _pearson_masked(X):
+    """Pearson r and n for every column pair of X, ignoring NaNs pairwise."""
+    M = ~np.isnan(X)
+    Mf = M.astype(float)
+    # Centering by the column mean does not change r but keeps sums small
+    count = M.sum(axis=0)
+    center = np.where(count > 0, np.where(M, X, 0.0).sum(axis=0) / np.maximum(count, 1), 0.0)
+    Xc = np.where(M, X - center, 0.0)
+
+    n   = Mf.T @ Mf
+    Sx  = Xc.T @ Mf           # Σ x over rows where y is also present
+    Sxx = (Xc**2).T @ Mf
+    Sxy = Xc.T @ Xc
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = Sxy - Sx * Sx.T / n
+        vx  = Sxx - Sx**2 / n
+        r = cov / np.sqrt(vx * vx.T)
+    return np.clip(r, -1.0, 1.0), n
+
+def _spearman_masked(X):
+    """Spearman r and n, ranking each pair on its pairwise-complete rows."""
+    p = X.shape[1]
+    M = ~np.isnan(X)
+    r = np.full((p, p), np.nan)
+
+    patterns, group = np.unique(M.T, axis=0, return_inverse=True)
+    group = group.ravel()
+    for a in range(len(patterns)):
+        for b in range(a, len(patterns)):
+            rows = patterns[a] & patterns[b]
+            ca, cb = np.flatnonzero(group == a), np.flatnonzero(group == b)
+            if rows.sum() < 2:
+                continue
+            Ra = stats.rankdata(X[np.ix_(rows, ca)], axis=0)
+            Rb = stats.rankdata(X[np.ix_(rows, cb)], axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                Za = (Ra - Ra.mean(axis=0)) / Ra.std(axis=0)
+                Zb = (Rb - Rb.mean(axis=0)) / Rb.std(axis=0)
+            block = Za.T @ Zb / rows.sum()
+            r[np.ix_(ca, cb)] = block
+            r[np.ix_(cb, ca)] = block.T
+
+    Mf = M.astype(float)
+    return np.clip(r, -1.0, 1.0), Mf.T @ Mf
+
+def corr_matrix(X, method="pearson"):
+    """r, p-value and n matrices for the columns of X (NaN = missing)."""
+    X = np.asarray(X, dtype=float)
+    if method == "pearson":
+        r, n = _pearson_masked(X)
+    elif method == "spearman":
+        r, n = _spearman_masked(X)
+    else:
+        raise ValueError(f"Unknown method {method!r}")
+
+    r[n < MIN_PAIRS] = np.nan
+    dof = n - 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = r * np.sqrt(dof / (1.0 - r**2))
+    p = 2 * stats.t.sf(np.abs(t), np.maximum(dof, 1))
+    p[np.isnan(r)] = np.nan
+    return r, p, n.astype(int)
+
+# ───── Long-format table ───────────────────────────────────────────────── #
+def correlation_table(df, variables, scope="pooled", methods=METHODS):
+    """One row per variable pair (upper triangle) and method."""
+    X = df[variables].to_numpy(dtype=float)
+    i, j = np.triu_indices(len(variables), 1)
+    names = np.asarray(variables)
+
+    frames = []
+    for method in methods:
+        r, p, n = corr_matrix(X, method)
+        frames.append(pd.DataFrame({
+            "scope":  scope,
+            "method": method,
+            "var_x":  names[i],
+            "var_y":  names[j],
+            "r":      r[i, j],
+            "p":      p[i, j],
+            "n":      n[i, j],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+# ───── Clustered heatmap ───────────────────────────────────────────────── #
+def plot_clustermap(table, path, method=HEATMAP_METHOD):
+    pooled = table[(table["scope"] == "pooled") & (table["method"] == method)]
+    mat = pooled.pivot(index="var_x", columns="var_y", values="r")
+    names = sorted(set(mat.index) | set(mat.columns))
+    mat = mat.reindex(index=names, columns=names)
+    mat = mat.combine_first(mat.T)
+    mat = mat.dropna(how="all").dropna(axis=1, how="all")  # e.g. constant variables
+    np.fill_diagonal(mat.values, 1.0)
+    if mat.shape[0] < 2:
+        print("⚠️  Not enough variables with valid correlations; heatmap skipped.")
+        return
+
+    size = max(6.0, 0.35 * len(mat))
+    grid = sns.clustermap(
+        mat.fillna(0.0), mask=mat.isna(), cmap="vlag", vmin=-1, vmax=1,
+        figsize=(size, size), linewidths=0.2, cbar_kws={"label": f"{method} r"},
+    )
+    grid.ax_heatmap.set_xlabel("")
+    grid.ax_heatmap.set_ylabel("")
+    grid.fig.suptitle(f"Correlation matrix (pooled, {method})", y=1.02)
+    grid.savefig(path, dpi=DPI, bbox_inches="tight")
+    plt.close(grid.fig)
+
+if __name__ == "__main__":
+    if not CSV_PATH.exists():
+        raise FileNotFoundError(
+            f"❌ File not found:\n  {CSV_PATH}\n"
+            "Please run `interval_kinetics.py` first."
+        )
+
+    df = pd.read_csv(CSV_PATH)
+    variables = [
+        c for c in df.select_dtypes(include="number").columns
+        if c not in EXCLUDE and df[c].notna().any()
+    ]
+
+    tables = [correlation_table(df, variables, "pooled")]
+    for cl, g in df.groupby("Clone", sort=True):
+        tables.append(correlation_table(g, variables, str(cl)))
+    table = pd.concat(tables, ignore_index=True)
+
+    OUTFILE.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(OUTFILE, index=False)
+
+    FIGURE_DIR.mkdir(parents=True, exist_ok=True)
+    plot_clustermap(table, FIGURE_DIR / "corr_clustermap.png")
+
+    print(f"\n✓ Variables correlated : {len(variables)}")
+    print(f"✓ Pairs per scope      : {len(variables) * (len(variables) - 1) // 2}")
+    print(f"✓ Correlation table saved to:\n  {OUTFILE}")
+    print(f"✓ Heatmap saved in ./{FIGURE_DIR}/")
@@ -34,11 +34,20 @@ import pandas as pd
 from pathlib import Path
 import os
 
+from backends import read_samples
+
 # ───── Configuration ───────────────────────────────────────────────────── #
 DATA_FILE = Path("data/data.csv")
 OUTFILE_REP = Path("outputs/kinetics_by_clone_rep.csv")
 OUTFILE_AGG = Path("outputs/kinetics_by_clone.csv")
 
+# DataFrame engine: "pandas" | "polars" | "duckdb" (None → $CLONALYZER_BACKEND)
+BACKEND = None
+
+# Read from the memory-mapped store (`shared_store.py`) instead of the CSV
+USE_STORE = False
+STORE_DIR = Path("outputs/store")
+
 MM_GLC = 180.156  # g/mol
 MM_LAC = 90.080   # g/mol
 
@@ -60,42 +69,15 @@ if __name__ == "__main__":
 else:
     EXP_START_HR, EXP_END_HR = 0, 96
 
-# ───── Load and filter data ────────────────────────────────────────────── #
-if not DATA_FILE.exists():
-    raise FileNotFoundError(f"❌ Input file not found:\n  {DATA_FILE}")
-
-df = (
-    pd.read_csv(DATA_FILE, skiprows=1)
-      .dropna(subset=["Clone", "Rep", "t_hr", "VCD"])
-      .assign(
-          Clone   = lambda d: d["Clone"].astype("category"),
-          Rep     = lambda d: pd.to_numeric(d["Rep"], errors="coerce").astype("Int64"),
-          t_hr    = lambda d: pd.to_numeric(d["t_hr"], errors="coerce"),
-          Vol_mL  = lambda d: pd.to_numeric(d["Vol_mL"], errors="coerce"),
-          Glc_g_L = lambda d: pd.to_numeric(d["Glc_g_L"], errors="coerce"),
-          Lac_g_L = lambda d: pd.to_numeric(d["Lac_g_L"], errors="coerce"),
-      )
-      .query(f"{EXP_START_HR} <= t_hr <= {EXP_END_HR}")
-      .sort_values(["Clone", "Rep", "t_hr"], ignore_index=True)
-)
-
 # ───── Unit conversion (g/L → mol/mL) ───────────────────────────────────── #
-df["Glc_mmol_L"] = df["Glc_g_L"] / MM_GLC * 1e3
-df["Lac_mmol_L"] = df["Lac_g_L"] / MM_LAC * 1e3
-df["Glc_mol_mL"] = df["Glc_mmol_L"] * 1e-6
-df["Lac_mol_mL"] = df["Lac_mmol_L"] * 1e-6
+def to_mol_mL(conc_g_L, molar_mass):
+    return conc_g_L / molar_mass * 1e3 * 1e-6
 
 # ───── Compute kinetics per Clone × Rep ─────────────────────────────────── #
-def compute_kinetics(group):
-    g = group.sort_values("t_hr")
-    t = g["t_hr"].values
-    x = g["VCD"].values
-    v = g["Vol_mL"].values
-    g_mol = g["Glc_mol_mL"].values
-    l_mol = g["Lac_mol_mL"].values
-
+def series_kinetics(t, x, v, g_mol, l_mol):
+    """Kinetic panel of one series (arrays sorted by t); None if < 2 points."""
     if len(t) < 2:
-        return pd.Series(dtype="float64")
+        return None
 
     mu   = (np.log(x[-1]) - np.log(x[0])) / (t[-1] - t[0])
     ivcd = np.trapz(x, t)
@@ -110,7 +92,7 @@ def compute_kinetics(group):
     q_G = (dG * 1e12) / ivcd if ivcd else np.nan
     q_L = (dL * 1e12) / ivcd if ivcd else np.nan
 
-    return pd.Series({
+    return {
         "mu": mu,
         "IVCD": ivcd,
         "dX": dX,
@@ -120,13 +102,57 @@ def compute_kinetics(group):
         "Y_XL": Y_XL,
         "q_Glc": q_G,
         "q_Lac": q_L,
-    })
+    }
 
-kin_df = (
-    df.groupby(["Clone", "Rep"], observed=True)
-      .apply(compute_kinetics)
-      .reset_index()
-)
+def compute_kinetics(group):
+    g = group.sort_values("t_hr")
+    kin = series_kinetics(
+        g["t_hr"].values, g["VCD"].values, g["Vol_mL"].values,
+        g["Glc_mol_mL"].values, g["Lac_mol_mL"].values,
+    )
+    return pd.Series(dtype="float64") if kin is None else pd.Series(kin)
+
+# ───── Load, filter and compute ────────────────────────────────────────── #
+if USE_STORE:
+    # Each Clone × Rep is a sorted slice of the memmapped columns
+    from shared_store import open_store
+
+    rows = []
+    columns = ["t_hr", "VCD", "Vol_mL", "Glc_g_L", "Lac_g_L"]
+    for clone, rep, s in open_store(STORE_DIR).iter_series(columns):
+        keep = ~np.isnan(s["VCD"]) & (s["t_hr"] >= EXP_START_HR) & (s["t_hr"] <= EXP_END_HR)
+        kin = series_kinetics(
+            s["t_hr"][keep], s["VCD"][keep], s["Vol_mL"][keep],
+            to_mol_mL(s["Glc_g_L"][keep], MM_GLC), to_mol_mL(s["Lac_g_L"][keep], MM_LAC),
+        )
+        if kin is not None:
+            rows.append({"Clone": clone, "Rep": rep, **kin})
+
+    kin_df = pd.DataFrame(rows).assign(
+        Clone = lambda d: d["Clone"].astype("category"),
+        Rep   = lambda d: d["Rep"].astype("Int64"),
+    )
+else:
+    df = read_samples(
+        DATA_FILE,
+        numeric=["Rep", "t_hr", "VCD", "Vol_mL", "Glc_g_L", "Lac_g_L"],
+        required=["Clone", "Rep", "t_hr", "VCD"],
+        window=(EXP_START_HR, EXP_END_HR),
+        backend=BACKEND,
+    )
+
+    df = df.assign(
+        Clone = lambda d: d["Clone"].astype("category"),
+        Rep   = lambda d: d["Rep"].astype("Int64"),
+        Glc_mol_mL = lambda d: to_mol_mL(d["Glc_g_L"], MM_GLC),
+        Lac_mol_mL = lambda d: to_mol_mL(d["Lac_g_L"], MM_LAC),
+    ).reset_index(drop=True)
+
+    kin_df = (
+        df.groupby(["Clone", "Rep"], observed=True)
+          .apply(compute_kinetics)
+          .reset_index()
+    )
 
 # ───── Save Clone × Rep output ──────────────────────────────────────────── #
 OUTFILE_REP.parent.mkdir(parents=True, exist_ok=True)
@@ -23,10 +23,15 @@ import numpy as np
 from pathlib import Path
 import os
 
+from backends import mean_sd
+
 # ───── Configuration ───────────────────────────────────────────────────── #
 INPUT_FILE  = Path("outputs/interval_kinetics.csv")
 OUTPUT_FILE = Path("outputs/results_agg_by_clone_time.csv")
 
+# DataFrame engine: "pandas" | "polars" | "duckdb" (None → $CLONALYZER_BACKEND)
+BACKEND = None
+
 # ───── Load data ───────────────────────────────────────────────────────── #
 if not INPUT_FILE.exists():
     raise FileNotFoundError(
@@ -34,23 +39,10 @@ if not INPUT_FILE.exists():
         "Please run `interval_kinetics.py` first."
     )
 
-df = pd.read_csv(INPUT_FILE)
-
-# ───── Identify numeric columns (exclude t_hr) ─────────────────────────── #
-numeric_cols = df.select_dtypes(include="number").columns.difference(["t_hr"])
-
 # ───── Group by Clone × t_hr and calculate mean ± SD ───────────────────── #
-agg_df = (
-    df.groupby(["Clone", "t_hr"], observed=True)[numeric_cols]
-      .agg(["mean", "std"])
-      .rename(columns={"mean": "avg", "std": "sd"})
-)
-
-# ───── Flatten MultiIndex column names ─────────────────────────────────── #
-agg_df.columns = [f"{var}_{stat}" for var, stat in agg_df.columns]
-
-# ───── Reset index to restore columns ──────────────────────────────────── #
-agg_df = agg_df.reset_index()
+# All numeric columns except t_hr; runs on the configured DataFrame engine.
+agg_df = mean_sd(INPUT_FILE, keys=["Clone", "t_hr"], names=("avg", "sd"),
+                 backend=BACKEND)
 
 # ───── Save result ─────────────────────────────────────────────────────── #
 OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -13,6 +13,7 @@ Workflow
    • Compute growth rate (μ, h⁻¹)
    • Estimate integrated viable cell density (IVCD, cell·h)
    • Calculate dX, dGlc, dLac, yields, and specific rates (qS)
+   (array kernels in `kinetics_kernels.py`; Numba-compiled if available)
 4. Save enriched DataFrame to `outputs/interval_kinetics.csv`.
 
 Outputs
@@ -29,10 +30,20 @@ import pandas as pd
 from pathlib import Path
 import os
 
+from backends import read_samples
+from kinetics_kernels import interval_kinetics, series_offsets
+
 # ───── Configuration ───────────────────────────────────────────────────── #
 DATA_FILE = Path("data/data.csv")
 OUTFILE   = Path("outputs/interval_kinetics.csv")
 
+# DataFrame engine: "pandas" | "polars" | "duckdb" (None → $CLONALYZER_BACKEND)
+BACKEND = None
+
+# Read from the memory-mapped store (`shared_store.py`) instead of the CSV
+USE_STORE = False
+STORE_DIR = Path("outputs/store")
+
 MM_GLUCOSE = 180.156  # g/mol
 MM_LACTATE = 90.080   # g/mol
 
@@ -42,27 +53,22 @@ KIN_COLS = [
 ]
 
 # ───── Load data ───────────────────────────────────────────────────────── #
-if not DATA_FILE.exists():
-    raise FileNotFoundError(f"❌ Input file not found:\n  {DATA_FILE}")
-
-df = (
-    pd.read_csv(DATA_FILE, skiprows=1)
-      .assign(
-          t_hr  = lambda d: pd.to_numeric(d["t_hr"], errors="coerce"),
-          Rep   = lambda d: pd.Categorical(
-                     pd.to_numeric(d["Rep"], errors="coerce"),
-                     categories=[1, 2, 3], ordered=True),
-          Clone = lambda d: d["Clone"].astype("category"),
-          Notes = lambda d: d["Notes"].astype(str).str.strip(),
-          Date  = lambda d: pd.to_datetime(d["Date"], format="%d/%m/%Y", errors="coerce"),
-          Timestamp = lambda d: d["Timestamp"].astype(str).str.strip(),
-          is_post_feed = lambda d: (
-              d["is_post_feed"]
-                .fillna(False)
-                .apply(lambda x: str(x).strip().lower() in {"true", "t", "1"})
-          )
-      )
-      .sort_values(["Clone", "Rep", "t_hr"], ignore_index=True)
+if USE_STORE:
+    from shared_store import open_store
+
+    store = open_store(STORE_DIR)
+    df = store.to_frame()  # output table; kinetics read the memmaps below
+else:
+    df = read_samples(DATA_FILE,
+                      numeric=["t_hr", "Rep", "VCD", "Vol_mL", "Glc_g_L", "Lac_g_L"],
+                      flags=["is_post_feed"], backend=BACKEND)
+
+df = df.assign(
+    Rep   = lambda d: pd.Categorical(d["Rep"], categories=[1, 2, 3], ordered=True),
+    Clone = lambda d: d["Clone"].astype("category"),
+    Notes = lambda d: d["Notes"].astype(str).str.strip(),
+    Date  = lambda d: pd.to_datetime(d["Date"], format="%d/%m/%Y", errors="coerce"),
+    Timestamp = lambda d: d["Timestamp"].astype(str).str.strip(),
 )
 
 # ───── Unit conversions ─────────────────────────────────────────────────── #
@@ -70,55 +76,35 @@ df["Glc_mM"]          = df["Glc_g_L"] / MM_GLUCOSE * 1e3
 df["Lac_mM"]          = df["Lac_g_L"] / MM_LACTATE * 1e3
 df["Glucose_mol_mL"]  = df["Glc_mM"] * 1e-6
 df["Lactate_mol_mL"]  = df["Lac_mM"] * 1e-6
-df[KIN_COLS]          = np.nan
 
 # ───── Kinetic calculations ─────────────────────────────────────────────── #
-for (clone, rep), group in df.groupby(["Clone", "Rep"], observed=True, sort=False):
-    g = group.sort_values("t_hr").reset_index()
-    idx_df = g["index"]
-
-    for i in range(1, len(g)):
-        t1 = g.loc[i]
-
-        if t1["t_hr"] <= 72:  # batch phase
-            t0 = g.loc[i - 1]
-
-        elif not t1["is_post_feed"]:  # pre-feed
-            pre_feed = g[(g["t_hr"] < t1["t_hr"]) & g["is_post_feed"]]
-            if pre_feed.empty:
-                continue
-            t0 = pre_feed.iloc[-1]
-
-        else:  # post-feed → skip
-            continue
-
-        Δt = t1["t_hr"] - t0["t_hr"]
-        if Δt <= 0:
-            continue
-
-        # Growth rate
-        mu = (np.log(t1["VCD"]) - np.log(t0["VCD"])) / Δt
-
-        # Total balances
-        dX = t1["VCD"] * t1["Vol_mL"] - t0["VCD"] * t0["Vol_mL"]
-        dG = t0["Glucose_mol_mL"] * t0["Vol_mL"] - t1["Glucose_mol_mL"] * t1["Vol_mL"]
-        dL = t1["Lactate_mol_mL"] * t1["Vol_mL"] - t0["Lactate_mol_mL"] * t0["Vol_mL"]
-
-        # Yields
-        Y_XG = dX / dG if dG else np.nan
-        Y_XL = dX / dL if dL else np.nan
-
-        # Integrated viable cell density
-        ivc_mL   = ((t0["VCD"] + t1["VCD"]) / 2) * Δt
-        IVCD_tot = ivc_mL * ((t0["Vol_mL"] + t1["Vol_mL"]) / 2)
-
-        # Specific rates
-        q_G = (dG * 1e12) / IVCD_tot if IVCD_tot else np.nan
-        q_L = (dL * 1e12) / IVCD_tot if IVCD_tot else np.nan
-
-        df.loc[idx_df[i], KIN_COLS] = [
-            mu, IVCD_tot, dX, dG, dL, Y_XG, Y_XL, q_G, q_L
-        ]
+# Per-interval anchor selection, balances, yields and q-rates run in one
+# pass over contiguous Clone × Rep series (Numba if installed, else NumPy).
+if USE_STORE:
+    # Memory-mapped columns and the store's own [start, stop) series index;
+    # Reps outside the categories are NaN above and get no kinetics
+    t, vcd, vol, post_feed = (
+        store.columns[c] for c in ("t_hr", "VCD", "Vol_mL", "is_post_feed")
+    )
+    keep = store.index["Rep"].isin(df["Rep"].cat.categories).to_numpy()
+    starts, stops = store.starts[keep], store.stops[keep]
+else:
+    t, vcd, vol = (df[c].to_numpy(dtype=float) for c in ("t_hr", "VCD", "Vol_mL"))
+    post_feed = df["is_post_feed"].to_numpy(dtype=bool)
+    series_id = (
+        df.groupby(["Clone", "Rep"], observed=True, sort=False)
+          .ngroup()
+          .fillna(-1)
+          .to_numpy()
+    )
+    starts, stops = series_offsets(series_id)
+
+df[KIN_COLS] = interval_kinetics(
+    t, vcd, vol,
+    df["Glucose_mol_mL"].to_numpy(dtype=float),
+    df["Lactate_mol_mL"].to_numpy(dtype=float),
+    post_feed, starts, stops,
+)
 
 # ───── Save and summary ─────────────────────────────────────────────────── #
 OUTFILE.parent.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+kinetics_kernels.py
+~~~~~~~~~~~~~~~~~~~
+Array kernels for the interval kinetics of `interval_kinetics.py`.
+
+The input is one set of contiguous arrays sorted by Clone × Rep × t_hr,
+with `starts` / `stops` marking the rows of each series.  For every row
+the kernel picks the interval anchor exactly like the original loop:
+
+  ─ Batch phase (t ≤ 72 h): the previous sample.
+  ─ Pre-feed sample: the last post-feed sample taken earlier.
+  ─ Post-feed sample: skipped.
+
+and returns μ, IVCD_tot, dX, dG, dL, Y_XG, Y_XL, q_G and q_L (NaN for rows
+without an interval).
+
+Two implementations are provided:
+• Numba (`@njit`), used automatically when `numba` is installed.
+• Pure NumPy, fully vectorized (no Python loop over rows or series).
+
+Run this file directly to check both against the reference loop (including
+tied t_hr, NaN t_hr / VCD and rows outside any series) and to benchmark
+them against the old pandas loop on a synthetic 10⁶-row dataset.
+
+Author
+------
+Emiliano Balderas R. | 16 Jul 2025
+"""
+
+import time
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# ───── Configuration ───────────────────────────────────────────────────── #
+BATCH_END_HR = 72.0
+
+KIN_COLS = [
+    "mu", "IVCD_tot", "dX", "dG", "dL",
+    "Y_XG", "Y_XL", "q_G", "q_L"
+]
+
+BENCH_ROWS = 1_000_000
+BENCH_SAMPLES = 20  # samples per Clone × Rep series
+
+# ───── Shared interval formulas ─────────────────────────────────────────── #
+def _interval_values(t0, t1, x0, x1, v0, v1, g0, g1, l0, l1):
+    """Kinetic panel for one or many (t0, t1) intervals (scalars or arrays)."""
+    dt = t1 - t0
+
+    # Growth rate
+    mu = (np.log(x1) - np.log(x0)) / dt
+
+    # Total balances
+    dX = x1 * v1 - x0 * v0
+    dG = g0 * v0 - g1 * v1
+    dL = l1 * v1 - l0 * v0
+
+    # Integrated viable cell density
+    ivc_mL   = ((x0 + x1) / 2) * dt
+    IVCD_tot = ivc_mL * ((v0 + v1) / 2)
+
+    return mu, IVCD_tot, dX, dG, dL
+
+# ───── NumPy kernel ─────────────────────────────────────────────────────── #
+def _anchors_numpy(t, post_feed, starts, stops, batch_end):
+    n = len(t)
+    pos = np.arange(n)
+
+    # Series start for every row (-1 outside any series)
+    first = np.full(n, -1)
+    first[starts] = starts
+    first = np.maximum.accumulate(first)
+    in_series = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(in_series, starts, 1)
+    np.add.at(in_series, stops, -1)
+    in_series = np.cumsum(in_series[:-1]) > 0
+
+    # First row of each run of equal t_hr (anchors need t0 < t1 strictly)
+    new_t = np.ones(n, dtype=bool)
+    new_t[1:] = t[1:] != t[:-1]
+    new_t[starts] = True
+    run_first = np.maximum.accumulate(np.where(new_t, pos, 0))
+
+    # Last post-feed row at or before each row, within the same series
+    last_post = np.maximum.accumulate(np.where(post_feed, pos, -1))
+    last_post = np.where(last_post >= first, last_post, -1)
+
+    prev_post = np.full(n, -1)
+    has_prev = run_first > first
+    prev_post[has_prev] = last_post[run_first[has_prev] - 1]
+
+    anchor = np.full(n, -1)
+    batch = (t <= batch_end) & (pos > first)
+    pre_feed = ~(t <= batch_end) & ~post_feed
+    anchor[batch] = pos[batch] - 1
+    anchor[pre_feed] = prev_post[pre_feed]
+    anchor[~in_series | np.isnan(t)] = -1
+    return anchor
+
+def interval_anchors(t, post_feed, starts, stops, batch_end=BATCH_END_HR):
+    """Row of each interval's start sample (t0), or -1 for rows without one.
+
+    Same anchor rule as the kernels, so `t[anchor]` → `t` is exactly the
+    interval that μ, IVCD_tot, … of that row were computed over.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    post_feed = np.asarray(post_feed, dtype=bool)
+    starts, stops = np.asarray(starts, dtype=np.int64), np.asarray(stops, dtype=np.int64)
+
+    anchor = _anchors_numpy(t, post_feed, starts, stops, batch_end)
+    i1 = np.flatnonzero(anchor >= 0)
+    anchor[i1[t[i1] - t[anchor[i1]] <= 0]] = -1
+    return anchor
+
+def interval_kinetics_numpy(t, vcd, vol, glc, lac, post_feed, starts, stops,
+                            batch_end=BATCH_END_HR):
+    """Vectorized interval kinetics; returns an (n, 9) array ordered as KIN_COLS."""
+    t, vcd, vol, glc, lac = (np.asarray(a, dtype=np.float64) for a in (t, vcd, vol, glc, lac))
+
+    out = np.full((len(t), len(KIN_COLS)), np.nan)
+    anchor = interval_anchors(t, post_feed, starts, stops, batch_end)
+
+    i1 = np.flatnonzero(anchor >= 0)
+    i0 = anchor[i1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mu, IVCD_tot, dX, dG, dL = _interval_values(
+            t[i0], t[i1], vcd[i0], vcd[i1], vol[i0], vol[i1],
+            glc[i0], glc[i1], lac[i0], lac[i1],
+        )
+
+        # Yields and specific rates (NaN when the denominator is zero)
+        Y_XG = np.where(dG != 0, dX / dG, np.nan)
+        Y_XL = np.where(dL != 0, dX / dL, np.nan)
+        q_G = np.where(IVCD_tot != 0, (dG * 1e12) / IVCD_tot, np.nan)
+        q_L = np.where(IVCD_tot != 0, (dL * 1e12) / IVCD_tot, np.nan)
+
+    out[i1] = np.column_stack([mu, IVCD_tot, dX, dG, dL, Y_XG, Y_XL, q_G, q_L])
+    return out
+
+# ───── Numba kernel ─────────────────────────────────────────────────────── #
+def _interval_loop(t, vcd, vol, glc, lac, post_feed, starts, stops, batch_end, out):
+    for s in range(len(starts)):
+        start, stop = starts[s], stops[s]
+        last_post = -1  # last post-feed row with t < t[i]
+        scan = start
+
+        for i in range(start + 1, stop):
+            if np.isnan(t[i]):
+                continue
+            while scan < i and t[scan] < t[i]:
+                if post_feed[scan]:
+                    last_post = scan
+                scan += 1
+
+            if t[i] <= batch_end:  # batch phase
+                j = i - 1
+            elif not post_feed[i]:  # pre-feed
+                if last_post < 0:
+                    continue
+                j = last_post
+            else:  # post-feed → skip
+                continue
+
+            dt = t[i] - t[j]
+            if dt <= 0:
+                continue
+
+            mu = (np.log(vcd[i]) - np.log(vcd[j])) / dt
+            dX = vcd[i] * vol[i] - vcd[j] * vol[j]
+            dG = glc[j] * vol[j] - glc[i] * vol[i]
+            dL = lac[i] * vol[i] - lac[j] * vol[j]
+            ivcd = ((vcd[j] + vcd[i]) / 2) * dt * ((vol[j] + vol[i]) / 2)
+
+            out[i, 0] = mu
+            out[i, 1] = ivcd
+            out[i, 2] = dX
+            out[i, 3] = dG
+            out[i, 4] = dL
+            out[i, 5] = dX / dG if dG != 0 else np.nan
+            out[i, 6] = dX / dL if dL != 0 else np.nan
+            out[i, 7] = (dG * 1e12) / ivcd if ivcd != 0 else np.nan
+            out[i, 8] = (dL * 1e12) / ivcd if ivcd != 0 else np.nan
+
+if HAS_NUMBA:
+    _interval_loop_jit = njit(cache=True, nogil=True)(_interval_loop)
+
+def interval_kinetics_numba(t, vcd, vol, glc, lac, post_feed, starts, stops,
+                            batch_end=BATCH_END_HR):
+    """Numba-compiled interval kinetics; same signature as the NumPy kernel."""
+    if not HAS_NUMBA:
+        raise ImportError("numba is not installed")
+    out = np.full((len(t), len(KIN_COLS)), np.nan)
+    _interval_loop_jit(
+        np.ascontiguousarray(t, dtype=np.float64),
+        np.ascontiguousarray(vcd, dtype=np.float64),
+        np.ascontiguousarray(vol, dtype=np.float64),
+        np.ascontiguousarray(glc, dtype=np.float64),
+        np.ascontiguousarray(lac, dtype=np.float64),
+        np.ascontiguousarray(post_feed, dtype=np.bool_),
+        np.ascontiguousarray(starts, dtype=np.int64),
+        np.ascontiguousarray(stops, dtype=np.int64),
+        float(batch_end), out,
+    )
+    return out
+
+# ───── Dispatcher ───────────────────────────────────────────────────────── #
+def interval_kinetics(t, vcd, vol, glc, lac, post_feed, starts, stops,
+                      batch_end=BATCH_END_HR):
+    """Interval kinetics over sorted series; Numba if available, else NumPy.
+
+    `glc` and `lac` are concentrations in mol/mL; `starts[k]:stops[k]` are
+    the rows of series k, sorted by t_hr.  Rows outside every series are
+    returned as NaN.
+    """
+    kernel = interval_kinetics_numba if HAS_NUMBA else interval_kinetics_numpy
+    return kernel(t, vcd, vol, glc, lac, post_feed, starts, stops, batch_end)
+
+def series_offsets(codes):
+    """[start, stop) offsets of contiguous runs of equal group codes ≥ 0."""
+    codes = np.asarray(codes)
+    if len(codes) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    change = np.ones(len(codes), dtype=bool)
+    change[1:] = codes[1:] != codes[:-1]
+    starts = np.flatnonzero(change)
+    stops = np.append(starts[1:], len(codes))
+    keep = codes[starts] >= 0
+    return starts[keep], stops[keep]
+
+# ───── Equivalence check & benchmark ──────────────────────────────────── #
+def _synthetic(n_rows, n_samples=BENCH_SAMPLES, seed=0, edge_cases=False):
+    """Sorted synthetic series plus their `starts` / `stops`.
+
+    With `edge_cases`, ~5 % of rows repeat the previous t_hr (ties), ~2 %
+    have NaN t_hr or VCD and ~2 % belong to no series (e.g. missing Rep).
+    Rows are then sorted like `interval_kinetics.py` sorts them: Clone,
+    Rep (missing last), t_hr (NaN last).
+    """
+    rng = np.random.default_rng(seed)
+    n_series = n_rows // n_samples
+    n = n_series * n_samples
+
+    day = np.tile(np.arange(n_samples), n_series)
+    post_feed = (day % 2 == 1) & (day > 6)  # pre/post-feed pairs after 72 h
+    t = np.where(post_feed, (day - 1) // 2 * 24 + 0.5, day // 2 * 24 + (day < 7) * (day % 2) * 12.0)
+    t = t + rng.uniform(0, 0.1, n)
+
+    vcd = 3e5 * np.exp(0.02 * t) * rng.uniform(0.9, 1.1, n)
+    vol = 30 + rng.uniform(-1, 1, n)
+    glc = rng.uniform(10, 40, n) * 1e-6
+    lac = rng.uniform(0, 20, n) * 1e-6
+
+    series = np.repeat(np.arange(n_series), n_samples)
+    if edge_cases:
+        tie = np.flatnonzero(rng.random(n) < 0.05)
+        tie = tie[tie > 0]
+        t[tie] = t[tie - 1]
+        t[rng.random(n) < 0.02] = np.nan
+        vcd[rng.random(n) < 0.02] = np.nan
+        series = np.where(rng.random(n) < 0.02, -1, series)
+
+    clone = np.repeat(np.arange(n_series), n_samples) // 3
+    rep = np.where(series >= 0, series % 3, 3)
+    order = np.lexsort((t, rep, clone))
+    starts, stops = series_offsets(series[order])
+    return (t[order], vcd[order], vol[order], glc[order], lac[order], post_feed[order],
+            starts, stops)
+
+def _reference(t, vcd, vol, glc, lac, post_feed, starts, stops, batch_end=BATCH_END_HR):
+    """Plain-Python transcription of the loop in `interval_kinetics.py`."""
+    out = np.full((len(t), len(KIN_COLS)), np.nan)
+    for start, stop in zip(starts, stops):
+        for i in range(start + 1, stop):
+            if t[i] <= batch_end:
+                j = i - 1
+            elif not post_feed[i]:
+                earlier = [k for k in range(start, stop) if t[k] < t[i] and post_feed[k]]
+                if not earlier:
+                    continue
+                j = earlier[-1]
+            else:
+                continue
+            dt = t[i] - t[j]
+            if dt <= 0:
+                continue
+            with np.errstate(invalid="ignore"):
+                mu, ivcd, dX, dG, dL = _interval_values(
+                    t[j], t[i], vcd[j], vcd[i], vol[j], vol[i], glc[j], glc[i], lac[j], lac[i])
+            out[i] = [mu, ivcd, dX, dG, dL,
+                      dX / dG if dG else np.nan, dX / dL if dL else np.nan,
+                      (dG * 1e12) / ivcd if ivcd else np.nan,
+                      (dL * 1e12) / ivcd if ivcd else np.nan]
+    return out
+
+def _pandas_loop(t, vcd, vol, glc, lac, post_feed, starts, stops, batch_end=BATCH_END_HR):
+    """The groupby / `.loc` loop that `interval_kinetics.py` used to run."""
+    import pandas as pd
+
+    series = np.full(len(t), np.nan)
+    for k, (start, stop) in enumerate(zip(starts, stops)):
+        series[start:stop] = k
+    df = pd.DataFrame({"series": series, "t_hr": t, "VCD": vcd, "Vol_mL": vol,
+                       "Glucose_mol_mL": glc, "Lactate_mol_mL": lac,
+                       "is_post_feed": post_feed})
+    df[KIN_COLS] = np.nan
+
+    for _, group in df.groupby("series", sort=False):
+        g = group.sort_values("t_hr").reset_index()
+        idx_df = g["index"]
+
+        for i in range(1, len(g)):
+            t1 = g.loc[i]
+
+            if t1["t_hr"] <= batch_end:  # batch phase
+                t0 = g.loc[i - 1]
+            elif not t1["is_post_feed"]:  # pre-feed
+                pre_feed = g[(g["t_hr"] < t1["t_hr"]) & g["is_post_feed"]]
+                if pre_feed.empty:
+                    continue
+                t0 = pre_feed.iloc[-1]
+            else:  # post-feed → skip
+                continue
+
+            dt = t1["t_hr"] - t0["t_hr"]
+            if dt <= 0:
+                continue
+
+            mu = (np.log(t1["VCD"]) - np.log(t0["VCD"])) / dt
+            dX = t1["VCD"] * t1["Vol_mL"] - t0["VCD"] * t0["Vol_mL"]
+            dG = t0["Glucose_mol_mL"] * t0["Vol_mL"] - t1["Glucose_mol_mL"] * t1["Vol_mL"]
+            dL = t1["Lactate_mol_mL"] * t1["Vol_mL"] - t0["Lactate_mol_mL"] * t0["Vol_mL"]
+            Y_XG = dX / dG if dG else np.nan
+            Y_XL = dX / dL if dL else np.nan
+            IVCD_tot = ((t0["VCD"] + t1["VCD"]) / 2) * dt * ((t0["Vol_mL"] + t1["Vol_mL"]) / 2)
+            q_G = (dG * 1e12) / IVCD_tot if IVCD_tot else np.nan
+            q_L = (dL * 1e12) / IVCD_tot if IVCD_tot else np.nan
+
+            df.loc[idx_df[i], KIN_COLS] = [mu, IVCD_tot, dX, dG, dL, Y_XG, Y_XL, q_G, q_L]
+
+    return df[KIN_COLS].to_numpy()
+
+def _check(kernel, data, ref, label):
+    np.testing.assert_allclose(kernel(*data), ref, rtol=1e-12, err_msg=label)
+
+if __name__ == "__main__":
+    # Equivalence: clean series, then ties / NaN t_hr / NaN VCD / gap rows
+    kernels = [("NumPy", interval_kinetics_numpy)]
+    if HAS_NUMBA:
+        kernels.append(("Numba", interval_kinetics_numba))
+
+    small = _synthetic(20_000)
+    cases = [small] + [_synthetic(2_000, seed=s, edge_cases=True) for s in range(50)]
+    for k, data in enumerate(cases):
+        ref = _reference(*data)
+        for name, kernel in kernels:
+            _check(kernel, data, ref, f"{name}, case {k}")
+    for k, data in enumerate(cases[1:6], 1):
+        _check(lambda *a: _pandas_loop(*a), data, _reference(*data), f"pandas loop, case {k}")
+    print(f"\n✓ Kernels match the reference loop ({len(cases)} datasets, "
+          f"{len(cases) - 1} with ties, NaNs and gap rows)")
+
+    # Benchmark on 10⁶ rows
+    big = _synthetic(BENCH_ROWS)
+    print(f"\n=== Benchmark: {len(big[0]):,} rows, {len(big[6]):,} series ===")
+
+    sub_rows = BENCH_ROWS // 1000
+    sub_series = sub_rows // BENCH_SAMPLES
+    t0 = time.perf_counter()
+    _pandas_loop(*(a[:sub_rows] for a in big[:6]), big[6][:sub_series], big[7][:sub_series])
+    elapsed = (time.perf_counter() - t0) * BENCH_ROWS / sub_rows
+    print(f"pandas loop (old, extrapolated from {sub_rows:,} rows) : {elapsed:8.3f} s")
+
+    t0 = time.perf_counter()
+    interval_kinetics_numpy(*big)
+    print(f"NumPy kernel                                  : {time.perf_counter() - t0:8.3f} s")
+
+    if HAS_NUMBA:
+        interval_kinetics_numba(*small)  # compile
+        t0 = time.perf_counter()
+        interval_kinetics_numba(*big)
+        print(f"Numba kernel                                  : {time.perf_counter() - t0:8.3f} s")
+    else:
+        print("Numba kernel                                  : not installed")
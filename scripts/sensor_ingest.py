@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sensor_ingest.py
+~~~~~~~~~~~~~~~~
+Attach high-frequency online sensor data (pH, DO, temperature, …) to the
+sampling intervals of `interval_kinetics.py`.
+
+Sensor logs are kept out of `data/data.csv`: they live in separate
+long-format CSV files, one reading per row:
+
+| Clone | Rep | t_hr  | signal | value |
+|-------|-----|-------|--------|-------|
+| A     | 1   | 0.017 | pH     | 7.02  |
+| A     | 1   | 0.017 | DO_pct | 41.3  |
+
+Files are expected in time order within each Clone × Rep × signal.
+
+Workflow
+--------
+1. Load the sampling points from `outputs/interval_kinetics.csv` and
+   rebuild each row's kinetic interval (t_start, t_hr] with the anchor rule
+   of `kinetics_kernels.py` (previous sample in batch phase, last post-feed
+   sample for pre-feed rows after 72 h).  Intervals may overlap.
+2. Stream every `data/sensors/*.csv` in chunks of `CHUNK_ROWS` rows.
+3. Assign each reading to the segment between two consecutive samples with
+   `pd.merge_asof` (direction="forward", by Clone × Rep) and reduce the
+   chunk to partial sums per segment × signal.  A running trapezoidal
+   integral is carried from chunk to chunk, so intervals spanning several
+   segments or chunks have no gaps.
+4. Combine the segments of each kinetic interval into mean / min / max /
+   integral and join them onto the kinetic table (one column per
+   signal × statistic).  Rows without a kinetic interval (post-feed
+   samples, first sample) get no sensor statistics.
+
+Only the per-segment summaries are ever held in memory, never the raw
+sensor stream.
+
+Outputs
+-------
+• outputs/interval_sensors.csv           – Clone, Rep, t_start, t_hr + sensor stats
+• outputs/interval_kinetics_sensors.csv  – interval kinetics + t_start + sensor stats
+
+Author
+------
+Emiliano Balderas R. | 16 Jul 2025
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from kinetics_kernels import interval_anchors, series_offsets
+
+# ───── Configuration ───────────────────────────────────────────────────── #
+SENSOR_DIR     = Path("data/sensors")
+SENSOR_GLOB    = "*.csv"
+KINETICS_FILE  = Path("outputs/interval_kinetics.csv")
+OUTFILE        = Path("outputs/interval_sensors.csv")
+OUTFILE_JOINED = Path("outputs/interval_kinetics_sensors.csv")
+
+CHUNK_ROWS = 1_000_000
+STATS      = ["mean", "min", "max", "integral"]  # integral: value·h
+
+KEYS    = ["Clone", "Rep"]
+SERIES  = KEYS + ["signal"]
+PARTIAL = KEYS + ["t_hr", "signal"]
+WINDOW  = KEYS + ["t_start", "t_hr"]
+
+# ───── Helper: sampling points, segments and kinetic intervals ────────── #
+def sample_points(kin):
+    """Clone, Rep, t_hr, is_post_feed of the kinetic table (same row order).
+
+    Rep and t_hr are always float64, like in the sensor chunks: `merge_asof`
+    needs identical key dtypes, and whole-number times or a blank Rep would
+    otherwise be read as int64 / float64 depending on the file or chunk.
+    """
+    return (
+        kin[KEYS + ["t_hr", "is_post_feed"]]
+          .assign(Clone = lambda d: d["Clone"].astype(str),
+                  Rep   = lambda d: pd.to_numeric(d["Rep"], errors="coerce").astype("float64"),
+                  t_hr  = lambda d: pd.to_numeric(d["t_hr"], errors="coerce").astype("float64"),
+                  is_post_feed = lambda d: (
+                      d["is_post_feed"].astype(str).str.strip().str.lower()
+                        .isin(["true", "t", "1"])
+                  ))
+          .dropna(subset=KEYS)
+    )
+
+def sampling_segments(pts):
+    """One row per distinct sampling time: segment (t_start, t_hr] per Clone × Rep."""
+    seg = (
+        pts[KEYS + ["t_hr"]]
+          .dropna()
+          .drop_duplicates()
+          .sort_values(KEYS + ["t_hr"], ignore_index=True)
+    )
+    seg["t_start"] = seg.groupby(KEYS, sort=False)["t_hr"].shift()
+    return seg.sort_values("t_hr", ignore_index=True)
+
+def kinetic_windows(pts):
+    """(t_start, t_hr] of every row with a kinetic interval, indexed like `pts`.
+
+    Rows must be in the order `interval_kinetics.py` wrote them (contiguous,
+    t_hr-sorted Clone × Rep series), so the anchors match the kinetics.
+    """
+    codes = pts.groupby(KEYS, sort=False).ngroup().to_numpy()
+    starts, stops = series_offsets(codes)
+    t = pts["t_hr"].to_numpy(dtype=float)
+    anchor = interval_anchors(t, pts["is_post_feed"].to_numpy(), starts, stops)
+
+    rows = anchor >= 0
+    return pts.loc[rows, KEYS + ["t_hr"]].assign(t_start=t[anchor[rows]])[WINDOW]
+
+# ───── Helper: reduce one chunk ────────────────────────────────────────── #
+def _reduce_chunk(chunk, segments, carry):
+    chunk = (
+        chunk.assign(Clone = lambda d: d["Clone"].astype(str),
+                     Rep   = lambda d: pd.to_numeric(d["Rep"], errors="coerce").astype("float64"),
+                     t_hr  = lambda d: pd.to_numeric(d["t_hr"], errors="coerce").astype("float64"),
+                     value = lambda d: pd.to_numeric(d["value"], errors="coerce"),
+                     signal = lambda d: d["signal"].astype(str))
+             .dropna(subset=KEYS + ["t_hr", "value"])
+             .rename(columns={"t_hr": "t_read"})
+             .sort_values("t_read")
+    )
+
+    # Segment (t_start, t_hr] closed by the first sample at or after t_read
+    chunk = pd.merge_asof(
+        chunk, segments,
+        left_on="t_read", right_on="t_hr", by=KEYS, direction="forward",
+    )
+    chunk = chunk[chunk["t_read"] > chunk["t_start"]]
+    chunk = chunk[SERIES + ["t_read", "value", "t_hr"]].assign(cum=np.nan, carried=False)
+
+    # Prepend the previous chunk's last reading per series, which carries
+    # the running integral (`cum`) forward
+    chunk = (
+        pd.concat([carry, chunk], ignore_index=True)
+          .sort_values(SERIES + ["t_read"], kind="stable", ignore_index=True)
+    )
+
+    prev = chunk.groupby(SERIES, sort=False)[["t_read", "value"]].shift()
+    piece = ((chunk["value"] + prev["value"]) / 2 * (chunk["t_read"] - prev["t_read"])).fillna(0.0)
+    piece = piece.where(~chunk["carried"], chunk["cum"])
+    chunk["cum"] = piece.groupby([chunk[c] for c in SERIES], sort=False).cumsum()
+
+    new_carry = chunk.groupby(SERIES, sort=False).tail(1).assign(carried=True)
+    new_carry = new_carry[SERIES + ["t_read", "value", "t_hr", "cum", "carried"]]
+
+    part = (
+        chunk[~chunk["carried"]]
+          .groupby(PARTIAL, sort=False)
+          .agg(n=("value", "count"), total=("value", "sum"),
+               min=("value", "min"), max=("value", "max"),
+               t_first=("t_read", "first"), c_first=("cum", "first"),
+               c_last=("cum", "last"))
+          .reset_index()
+    )
+    return part, new_carry
+
+# ───── Ingest all sensor files ─────────────────────────────────────────── #
+def ingest_sensors(files, pts, chunk_rows=CHUNK_ROWS):
+    """Sensor statistics per kinetic interval (wide: one column per signal × stat).
+
+    The integral runs over consecutive readings inside (t_start, t_hr].
+    """
+    segments = sampling_segments(pts)
+    windows = kinetic_windows(pts).drop_duplicates()
+    carry = None
+    parts = []
+
+    for path in files:
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            part, carry = _reduce_chunk(chunk, segments, carry)
+            parts.append(part)
+
+    if not parts or windows.empty:
+        return windows.iloc[:0]
+
+    # Segments of every interval, in time order
+    seg = pd.concat(parts, ignore_index=True).rename(columns={"t_hr": "t_seg"})
+    seg = windows.merge(seg, on=KEYS)
+    seg = (
+        seg[(seg["t_seg"] > seg["t_start"]) & (seg["t_seg"] <= seg["t_hr"])]
+          .sort_values("t_first", kind="stable")
+    )
+
+    agg = (
+        seg.groupby(WINDOW + ["signal"])
+           .agg(n=("n", "sum"), total=("total", "sum"), min=("min", "min"),
+                max=("max", "max"), c_first=("c_first", "first"),
+                c_last=("c_last", "last"))
+    )
+    agg["mean"] = agg["total"] / agg["n"]
+    agg["integral"] = agg["c_last"] - agg["c_first"]
+
+    wide = agg[STATS].unstack("signal")
+    wide.columns = [f"{sig}_{stat}" for stat, sig in wide.columns]
+    wide = wide[sorted(wide.columns)]
+    return wide.reset_index()
+
+def join_sensors(kin, pts, sensors):
+    """Attach t_start and the sensor statistics to each row of the kinetic table."""
+    stats = (
+        kinetic_windows(pts).reset_index()
+          .merge(sensors, on=WINDOW, how="left")
+          .set_index("index")
+          .drop(columns=KEYS + ["t_hr"])
+    )
+    return kin.join(stats)
+
+if __name__ == "__main__":
+    if not KINETICS_FILE.exists():
+        raise FileNotFoundError(
+            f"❌ Input file not found:\n  {KINETICS_FILE}\n"
+            "Please run `interval_kinetics.py` first."
+        )
+
+    files = sorted(SENSOR_DIR.glob(SENSOR_GLOB))
+    if not files:
+        raise FileNotFoundError(f"❌ No sensor files found in:\n  {SENSOR_DIR}")
+
+    kin = pd.read_csv(KINETICS_FILE)
+    pts = sample_points(kin)
+    sensors = ingest_sensors(files, pts)
+
+    OUTFILE.parent.mkdir(parents=True, exist_ok=True)
+    sensors.to_csv(OUTFILE, index=False)
+    join_sensors(kin, pts, sensors).to_csv(OUTFILE_JOINED, index=False)
+
+    print(f"\n✓ Sensor files read    : {len(files)}")
+    print(f"✓ Intervals with data  : {len(sensors)}")
+    print(f"✓ Sensor summary saved to:\n  {OUTFILE}")
+    print(f"✓ Joined kinetics saved to:\n  {OUTFILE_JOINED}")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared_store.py
+~~~~~~~~~~~~~~~
+Columnar, memory-mapped copy of the cleaned CHO fed-batch dataset for
+zero-copy access from parallel workers.
+
+Parsing `data/data.csv` (or pickling the full DataFrame) once per worker
+is slow and duplicates the data in every process.  This module writes the
+numeric columns once as NumPy `.npy` files, sorted by Clone × Rep × t_hr,
+plus a small offset index.  Workers then open the store read-only with
+`np.load(..., mmap_mode="r")`: the OS page cache is shared between
+processes and slicing a series returns views, not copies.
+
+Text columns (`Notes`, `Date`, `Timestamp`, any extra text column) are kept
+in `extra.csv` in the same row order, so `to_frame()` returns every column
+of the CSV.  Rows without a Clone or Rep cannot belong to a series and are
+not stored; rows with a missing t_hr are kept at the end of their series.
+
+Workflow
+--------
+1. Load and clean `data/data.csv` (skips metadata row).
+2. Sort by Clone × Rep × t_hr and write one `.npy` file per numeric column
+   (plus `extra.csv` for text columns and `columns.txt` for column order).
+3. Write `index.csv` with the [start, stop) row offsets of each Clone × Rep.
+
+Usage
+-----
+    store = open_store("outputs/store")
+    s = store.series("A", 1)          # dict of read-only array views
+    s["t_hr"], s["VCD"], s["Vol_mL"]
+
+Outputs
+-------
+• outputs/store/<column>.npy
+• outputs/store/extra.csv
+• outputs/store/columns.txt
+• outputs/store/index.csv
+
+Author
+------
+Emiliano Balderas R. | 16 Jul 2025
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# ───── Configuration ───────────────────────────────────────────────────── #
+DATA_FILE = Path("data/data.csv")
+STORE_DIR = Path("outputs/store")
+INDEX_FILE = "index.csv"
+EXTRA_FILE = "extra.csv"
+COLUMNS_FILE = "columns.txt"
+
+NUMERIC_COLS = [
+    "t_hr", "VCD", "Viab_pct", "Vol_mL",
+    "Glc_g_L", "Lac_g_L", "Gln_mM", "Glu_mM",
+]
+OPTIONAL_COLS = ["GFP_mean", "TMRM_mean"]
+FLAG_COLS = ["is_post_feed"]
+
+# ───── Helper: load and clean the raw CSV ─────────────────────────────── #
+def load_clean(path=DATA_FILE):
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"❌ Input file not found:\n  {path}")
+
+    df = pd.read_csv(path, skiprows=1)
+    num_cols = NUMERIC_COLS + [c for c in OPTIONAL_COLS if c in df.columns]
+
+    df = (
+        df.assign(
+            Rep = lambda d: pd.to_numeric(d["Rep"], errors="coerce"),
+            is_post_feed = lambda d: (
+                d["is_post_feed"]
+                  .fillna(False)
+                  .apply(lambda x: str(x).strip().lower() in {"true", "t", "1"})
+            ),
+            **{c: (lambda d, c=c: pd.to_numeric(d[c], errors="coerce")) for c in num_cols},
+        )
+        .dropna(subset=["Clone", "Rep"])
+        .assign(
+            Clone = lambda d: d["Clone"].astype(str),
+            Rep   = lambda d: d["Rep"].astype("int64"),
+        )
+        .sort_values(["Clone", "Rep", "t_hr"], ignore_index=True, kind="stable")
+    )
+    return df
+
+# ───── Build store ─────────────────────────────────────────────────────── #
+def build_store(df, store_dir=STORE_DIR):
+    """Write a cleaned, Clone × Rep × t_hr-sorted frame as `.npy` columns."""
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    for old in store_dir.glob("*.npy"):  # columns left over from an earlier build
+        old.unlink()
+    (store_dir / EXTRA_FILE).unlink(missing_ok=True)
+
+    df = df.sort_values(["Clone", "Rep", "t_hr"], ignore_index=True, kind="stable")
+    columns = [c for c in df.columns if c not in ("Clone", "Rep")]
+
+    text_cols = []
+    for col in columns:
+        if col in FLAG_COLS:
+            np.save(store_dir / f"{col}.npy", df[col].to_numpy(dtype=bool))
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            np.save(store_dir / f"{col}.npy", df[col].to_numpy())
+        else:
+            text_cols.append(col)
+
+    if text_cols:
+        df[text_cols].to_csv(store_dir / EXTRA_FILE, index=False)
+    (store_dir / COLUMNS_FILE).write_text("\n".join(df.columns) + "\n")
+
+    # Clone × Rep offsets: rows [start, stop) belong to one series
+    keys = df[["Clone", "Rep"]]
+    new_series = keys.ne(keys.shift()).any(axis=1).to_numpy()
+    starts = np.flatnonzero(new_series)
+    stops = np.append(starts[1:], len(df))
+
+    index = keys.iloc[starts].reset_index(drop=True).assign(start=starts, stop=stops)
+    index.to_csv(store_dir / INDEX_FILE, index=False)
+    return index
+
+# ───── Read-only access ────────────────────────────────────────────────── #
+class SharedStore:
+    """Read-only, memory-mapped view of a store written by `build_store`."""
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = Path(store_dir)
+        index_path = self.store_dir / INDEX_FILE
+        if not index_path.exists():
+            raise FileNotFoundError(
+                f"❌ Store not found:\n  {self.store_dir}\n"
+                "Please run `shared_store.py` first."
+            )
+
+        self.index = pd.read_csv(index_path, dtype={"Clone": str})
+        self.starts = self.index["start"].to_numpy(dtype=np.int64)
+        self.stops = self.index["stop"].to_numpy(dtype=np.int64)
+
+        # Only the columns of the last build, in CSV order
+        self.column_order = (self.store_dir / COLUMNS_FILE).read_text().splitlines()
+        self.columns = {
+            c: np.load(self.store_dir / f"{c}.npy", mmap_mode="r")
+            for c in self.column_order if (self.store_dir / f"{c}.npy").exists()
+        }
+        self.text_columns = [
+            c for c in self.column_order
+            if c not in self.columns and c not in ("Clone", "Rep")
+        ]
+        self._offsets = {
+            (cl, rp): (start, stop)
+            for cl, rp, start, stop in self.index.itertuples(index=False)
+        }
+
+    def __len__(self):
+        return len(self.columns["t_hr"])
+
+    def keys(self):
+        return list(self._offsets)
+
+    def series(self, clone, rep, columns=None):
+        """Zero-copy views of one Clone × Rep series, sorted by t_hr."""
+        try:
+            start, stop = self._offsets[(str(clone), int(rep))]
+        except KeyError:
+            raise KeyError(f"Clone {clone!r}, Rep {rep!r} not in store") from None
+        cols = self.columns if columns is None else {c: self.columns[c] for c in columns}
+        return {name: arr[start:stop] for name, arr in cols.items()}
+
+    def iter_series(self, columns=None):
+        for clone, rep in self._offsets:
+            yield clone, rep, self.series(clone, rep, columns)
+
+    def to_frame(self, columns=None):
+        """Materialize the store as a DataFrame (copies the data).
+
+        Without `columns`, returns every stored column (text columns
+        included) in the order of the original CSV.
+        """
+        if columns is None:
+            columns = [c for c in self.column_order if c not in ("Clone", "Rep")]
+        text = [c for c in columns if c in self.text_columns]
+
+        lengths = self.stops - self.starts
+        df = pd.DataFrame({
+            "Clone": np.repeat(self.index["Clone"].to_numpy(), lengths),
+            "Rep":   np.repeat(self.index["Rep"].to_numpy(), lengths),
+        })
+        if text:
+            extra = pd.read_csv(self.store_dir / EXTRA_FILE, usecols=text, dtype=str)
+            for name in text:
+                df[name] = extra[name].to_numpy()
+        for name in columns:
+            if name not in text:
+                df[name] = np.asarray(self.columns[name])
+
+        order = [c for c in self.column_order if c in df.columns]
+        return df[order]
+
+def open_store(store_dir=STORE_DIR):
+    return SharedStore(store_dir)
+
+if __name__ == "__main__":
+    df = load_clean(DATA_FILE)
+    index = build_store(df, STORE_DIR)
+    print(f"\n✓ Rows stored        : {len(df)}")
+    print(f"✓ Clone × Rep series : {len(index)}")
+    print(f"✓ Store saved to:\n  {STORE_DIR}")